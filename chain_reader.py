@@ -0,0 +1,59 @@
+import io
+
+
+class ChainReader(io.RawIOBase):
+    """Read-only stream over a file's data chain, one cluster (or extent) at a time."""
+
+    # Clusters fetched per range read on contiguous files
+    EXTENT_READ_CLUSTERS = 16
+
+    def __init__(self, disk, fat_manager, entry):
+        super().__init__()
+        self.disk = disk
+        self.remaining = entry.file_size
+        self.buffer = b""
+
+        if entry.first_cluster == 0 or entry.file_size == 0:
+            self.clusters = iter(())
+        elif entry.is_contiguous and fat_manager.check_extent(entry.first_cluster, entry.last_cluster):
+            self.clusters = None
+            self.next_cluster = entry.first_cluster
+            self.last_cluster = entry.last_cluster
+        else:
+            self.clusters = fat_manager.iter_chain(entry.first_cluster)
+
+    def readable(self):
+        return True
+
+    def _next_chunk(self):
+        if self.clusters is None:
+            # Contiguous extent: read several clusters per call
+            if self.next_cluster > self.last_cluster:
+                return b""
+            count = min(self.last_cluster - self.next_cluster + 1, self.EXTENT_READ_CLUSTERS)
+            data = self.disk.read_clusters(self.next_cluster, count)
+            self.next_cluster += count
+            return data
+
+        cluster_idx = next(self.clusters, None)
+        if cluster_idx is None:
+            return b""
+        return self.disk.read_cluster(cluster_idx)
+
+    def readinto(self, b):
+        # Fill b completely unless the file ends: tarfile treats short reads as truncation
+        n = 0
+        while n < len(b):
+            if not self.buffer:
+                if self.remaining <= 0:
+                    break
+                self.buffer = self._next_chunk()[:self.remaining]
+                if not self.buffer:
+                    break
+                self.remaining -= len(self.buffer)
+
+            take = min(len(b) - n, len(self.buffer))
+            b[n:n + take] = self.buffer[:take]
+            self.buffer = self.buffer[take:]
+            n += take
+        return n
@@ -0,0 +1,57 @@
+import hashlib
+
+
+class DedupManager:
+    """Content-addressed index of file data chains.
+
+    A FAT cluster has a single "next" pointer, so two files can only share
+    clusters if they share the whole chain. Deduplication therefore works on
+    complete file contents: identical data maps to one physical chain whose
+    reference count lives in the FatTableManager.
+    """
+
+    def __init__(self, disk, fat_manager):
+        self.disk = disk
+        self.fat = fat_manager
+        self.index = {}       # digest -> chain head
+        self.digests = {}     # chain head -> digest
+
+    @staticmethod
+    def digest(content):
+        return hashlib.sha256(content).digest()
+
+    def lookup(self, content):
+        # Returns the head of an existing chain holding exactly this content
+        return self.index.get(self.digest(content))
+
+    def register(self, start_cluster, content):
+        key = self.digest(content)
+        if key not in self.index:
+            self.index[key] = start_cluster
+            self.digests[start_cluster] = key
+
+    def share(self, start_cluster):
+        self.fat.add_ref(start_cluster)
+
+    def forget(self, start_cluster):
+        key = self.digests.pop(start_cluster, None)
+        if key is not None:
+            del self.index[key]
+
+    def release(self, start_cluster):
+        # Drop one reference; the chain is only freed (and unindexed) by its last owner
+        freed = self.fat.free_chain(start_cluster)
+        if freed:
+            self.forget(start_cluster)
+        return freed
+
+    def rebuild(self, chains):
+        """Rehash file data; chains maps chain head -> file size (owners are counted by FileSystem)."""
+        self.index.clear()
+        self.digests.clear()
+
+        for start_cluster, file_size in chains.items():
+            content = bytearray()
+            for cluster_idx in self.fat.follow_chain(start_cluster):
+                content.extend(self.disk.read_cluster(cluster_idx))
+            self.register(start_cluster, bytes(content[:file_size]))
@@ -1,5 +1,5 @@
 import fs_constants
-from directory_entry import DirectoryEntry
+from directory_entry import DirectoryEntry, ENTRY_STRUCT
 
 
 class Directory:
@@ -7,35 +7,41 @@ class Directory:
         self.disk = disk
         self.fat = fat_manager
 
-    def read_directory(self, start_cluster):
-        entries = []
-        chain = self.fat.follow_chain(start_cluster)
-
-        for cluster_idx in chain:
+    def _iter_slots(self, start_cluster):
+        # Reads one cluster at a time and yields (cluster, offset, raw fields) per used slot
+        for cluster_idx in self.fat.iter_chain(start_cluster):
             data = self.disk.read_cluster(cluster_idx)
 
-            # Iterate over 32-byte chunks
-            for i in range(0, len(data), fs_constants.DIR_ENTRY_SIZE):
-                chunk = data[i: i + fs_constants.DIR_ENTRY_SIZE]
-
+            # Decode the whole cluster in one pass (32-byte slots)
+            for i, fields in enumerate(ENTRY_STRUCT.iter_unpack(data)):
                 # Skip empty entries (marked with 0x00)
-                if chunk[0] == fs_constants.EMPTY_ENTRY:
+                if fields[0][0] == fs_constants.EMPTY_ENTRY:
                     continue
 
-                entries.append(DirectoryEntry.from_bytes(chunk))
-        return entries
+                yield cluster_idx, i * fs_constants.DIR_ENTRY_SIZE, fields
 
-    def find_entry(self, start_cluster, filename):
-        # We construct a dummy entry to get the hashed 8.3 name (e.g., "FILE.TXT" -> "FILE    TXT")
-        target_name = DirectoryEntry(filename).name
-
-        # Read all entries and search (Simple Linear Search)
-        entries = self.read_directory(start_cluster)
-        for entry in entries:
-            if entry.name == target_name:
-                return entry
+    def iter_entries(self, start_cluster):
+        """Yield (entry, cluster_idx, offset) lazily, reading clusters on demand."""
+        for cluster_idx, offset, fields in self._iter_slots(start_cluster):
+            yield DirectoryEntry.from_fields(*fields), cluster_idx, offset
+
+    def read_directory(self, start_cluster):
+        return [entry for entry, _, _ in self.iter_entries(start_cluster)]
+
+    def locate_entry(self, start_cluster, filename):
+        # Raw 8.3 name bytes (e.g., "FILE.TXT" -> b"FILE    TXT")
+        target_name = DirectoryEntry.format_name(filename)
+
+        # Compare raw names and stop at the first hit, only build the match
+        for cluster_idx, offset, fields in self._iter_slots(start_cluster):
+            if fields[0] == target_name:
+                return DirectoryEntry.from_fields(*fields), cluster_idx, offset
         return None
 
+    def find_entry(self, start_cluster, filename):
+        found = self.locate_entry(start_cluster, filename)
+        return found[0] if found else None
+
     def add_entry(self, start_cluster, entry):
         chain = self.fat.follow_chain(start_cluster)
         entry_bytes = entry.to_bytes()
@@ -65,31 +71,26 @@ class Directory:
         new_data[0: fs_constants.DIR_ENTRY_SIZE] = entry_bytes
         self.disk.write_cluster(new_cluster, new_data)
 
-    def remove_entry(self, start_cluster, filename):
-        target_name = DirectoryEntry(filename).name
-        chain = self.fat.follow_chain(start_cluster)
-
-        for cluster_idx in chain:
-            data = bytearray(self.disk.read_cluster(cluster_idx))
-            dirty = False
-
-            for i in range(0, len(data), fs_constants.DIR_ENTRY_SIZE):
-                chunk = data[i: i + fs_constants.DIR_ENTRY_SIZE]
-
-                if chunk[0] == fs_constants.EMPTY_ENTRY:
-                    continue
-
-                # Check if this is the file we want to delete
-                entry = DirectoryEntry.from_bytes(chunk)
-                if entry.name == target_name:
-                    # Mark as empty (write 0x00 to first byte)
-                    data[i] = fs_constants.EMPTY_ENTRY
-                    dirty = True
-                    # Found and deleted, break inner loop
-                    break
+    def update_entry(self, start_cluster, entry):
+        # Rewrite an existing slot in place (matched by name)
+        found = self.locate_entry(start_cluster, entry.raw_name)
+        if not found:
+            return False
 
-            if dirty:
-                self.disk.write_cluster(cluster_idx, data)
-                return True
+        _, cluster_idx, offset = found
+        data = bytearray(self.disk.read_cluster(cluster_idx))
+        data[offset: offset + fs_constants.DIR_ENTRY_SIZE] = entry.to_bytes()
+        self.disk.write_cluster(cluster_idx, data)
+        return True
 
-        return False
\ No newline at end of file
+    def remove_entry(self, start_cluster, filename):
+        found = self.locate_entry(start_cluster, filename)
+        if not found:
+            return False
+
+        # Mark as empty (write 0x00 to first byte)
+        _, cluster_idx, offset = found
+        data = bytearray(self.disk.read_cluster(cluster_idx))
+        data[offset] = fs_constants.EMPTY_ENTRY
+        self.disk.write_cluster(cluster_idx, data)
+        return True
\ No newline at end of file
@@ -1,21 +1,39 @@
 import struct
 import fs_constants
 
+# Struct: 11s(Name) + B(Attr) + I(Cluster) + I(Size) + I(MTime) + I(Last Cluster) + B(Flags) + 3x(Padding) = 32 bytes
+# MTime, Last Cluster and Flags live in what used to be padding; zero means "unknown".
+ENTRY_STRUCT = struct.Struct('<11sBIIIIB3x')
+
 
 class DirectoryEntry:
-    def __init__(self, name, attr=fs_constants.ATTR_FILE, first_cluster=0, size=0):
+    # Entries are created for every slot of every listed cluster, keep them small
+    __slots__ = ('raw_name', 'attr', 'first_cluster', 'file_size', 'mtime', 'last_cluster', 'flags')
+
+    def __init__(self, name, attr=fs_constants.ATTR_FILE, first_cluster=0, size=0,
+                 mtime=0, last_cluster=0, flags=0):
         self.attr = attr
         self.first_cluster = first_cluster
         self.file_size = size
+        self.mtime = mtime                # Unix seconds of last modification
+        self.last_cluster = last_cluster  # Cached tail of the data chain
+        self.flags = flags
+        self.raw_name = self.format_name(name)
+
+    @staticmethod
+    def format_name(name):
+        # Raw 11-byte names (read from disk) are kept as they are
+        if isinstance(name, bytes):
+            return name[:11].ljust(11)
 
-        # Logic: If name is already 11 chars (read from disk), keep it.
+        # Logic: If name is already 11 chars, keep it.
         # Otherwise, apply 8.3 formatting (user input).
-        if len(name) == 11:
-            self.name = name
-        else:
-            self.name = self._format_8_3(name)
+        if len(name) != 11:
+            name = DirectoryEntry._format_8_3(name)
+        return name.encode('utf-8')[:11].ljust(11)
 
-    def _format_8_3(self, name):
+    @staticmethod
+    def _format_8_3(name):
         # Convert "file.txt" to "FILE    TXT"
         name = name.upper().strip('.')  # Remove leading/trailing dots
         if "." in name:
@@ -27,29 +45,52 @@ class DirectoryEntry:
             return name[:11].ljust(11)
 
     def to_bytes(self):
-        # Struct: 11s(Name) + B(Attr) + I(Cluster) + I(Size) + 12x(Padding) = 32 bytes
-        return struct.pack(
-            '<11sBII12x',
-            self.name.encode('utf-8'),
+        return ENTRY_STRUCT.pack(
+            self.raw_name,
             self.attr,
             self.first_cluster,
-            self.file_size
+            self.file_size,
+            self.mtime,
+            self.last_cluster,
+            self.flags
         )
 
+    @classmethod
+    def from_fields(cls, raw_name, attr, first_cluster, size, mtime=0, last_cluster=0, flags=0):
+        # Fast path for decoded slots: skip __init__ and the 8.3 formatting
+        entry = cls.__new__(cls)
+        entry.raw_name = raw_name
+        entry.attr = attr
+        entry.first_cluster = first_cluster
+        entry.file_size = size
+        entry.mtime = mtime
+        entry.last_cluster = last_cluster
+        entry.flags = flags
+        return entry
+
     @classmethod
     def from_bytes(cls, data):
         if len(data) != fs_constants.DIR_ENTRY_SIZE:
             raise ValueError(f"Invalid entry size: {len(data)}")
 
-        unpacked = struct.unpack('<11sBII12x', data)
-        # unpacked = (name_bytes, attr, cluster, size)
-        return cls(unpacked[0].decode('utf-8'), unpacked[1], unpacked[2], unpacked[3])
+        # unpacked = (name_bytes, attr, cluster, size, mtime, last_cluster, flags)
+        return cls.from_fields(*ENTRY_STRUCT.unpack(data))
+
+    @property
+    def is_contiguous(self):
+        # Data occupies first_cluster..last_cluster back to back
+        return bool(self.flags & fs_constants.FLAG_CONTIGUOUS) and self.last_cluster >= self.first_cluster > 0
+
+    @property
+    def name(self):
+        # 11-char 8.3 name, e.g. "FILE    TXT"
+        return self.raw_name.decode('utf-8', errors='replace')
 
     @property
     def clean_name(self):
         # Convert "FILE    TXT" back to "FILE.TXT"
-        base = self.name[:8].strip()
-        ext = self.name[8:].strip()
+        base = self.raw_name[:8].strip()
+        ext = self.raw_name[8:].strip()
         if ext:
-            return f"{base}.{ext}"
-        return base
\ No newline at end of file
+            return f"{base.decode('utf-8', errors='replace')}.{ext.decode('utf-8', errors='replace')}"
+        return base.decode('utf-8', errors='replace')
\ No newline at end of file
@@ -1,3 +1,4 @@
+import contextlib
 import fs_constants
 from converter import Converter
 
@@ -6,6 +7,12 @@ class FatTableManager:
     def __init__(self, disk):
         self.disk = disk
         self.fat = [0] * fs_constants.CLUSTERS_NUMBER
+        # Reference counts for chains shared by several entries (chain head -> count).
+        # Chains missing from this dict have a single owner.
+        self.ref_counts = {}
+        # write_fat() calls are batched while inside deferred_writes()
+        self._defer_depth = 0
+        self._dirty = False
 
     def load_fat(self):
         # Read FAT clusters into memory
@@ -15,7 +22,23 @@ class FatTableManager:
 
         self.fat = Converter.bytes_to_int_list(buffer)
 
+    @contextlib.contextmanager
+    def deferred_writes(self):
+        # Bulk operations: persist the table once when the outermost block exits
+        self._defer_depth += 1
+        try:
+            yield
+        finally:
+            self._defer_depth -= 1
+            if self._defer_depth == 0 and self._dirty:
+                self.write_fat()
+
     def write_fat(self):
+        if self._defer_depth:
+            self._dirty = True
+            return
+        self._dirty = False
+
         # Serialize FAT to bytes
         data = Converter.int_list_to_bytes(self.fat)
 
@@ -45,6 +68,13 @@ class FatTableManager:
         if n_clusters == 0:
             return -1
 
+        # Prefer one contiguous run (enables single range I/O on the data)
+        run_start = self._find_free_run(n_clusters)
+        if run_start is not None:
+            self._link_run(run_start, n_clusters)
+            self.write_fat()
+            return run_start
+
         # Search for free slots
         free_indices = []
         for i in range(fs_constants.ROOT_DIR_CLUSTER, fs_constants.CLUSTERS_NUMBER):
@@ -67,6 +97,65 @@ class FatTableManager:
         self.write_fat()
         return free_indices[0]
 
+    def allocate_extents(self, sizes):
+        """Allocate one chain per size (in clusters), back to back when one free run fits all."""
+        run_start = self._find_free_run(sum(sizes))
+        if run_start is None:
+            with self.deferred_writes():
+                return [self.allocate_chain(n) for n in sizes]
+
+        starts = []
+        for n in sizes:
+            if n == 0:
+                starts.append(-1)
+                continue
+            self._link_run(run_start, n)
+            starts.append(run_start)
+            run_start += n
+
+        self.write_fat()
+        return starts
+
+    def _find_free_run(self, n_clusters):
+        # First fit: start of n consecutive free clusters, or None
+        run_start, run_len = None, 0
+        for i in range(fs_constants.ROOT_DIR_CLUSTER, fs_constants.CLUSTERS_NUMBER):
+            if self.fat[i] != fs_constants.FREE_CLUSTER:
+                run_len = 0
+                continue
+            if run_len == 0:
+                run_start = i
+            run_len += 1
+            if run_len == n_clusters:
+                return run_start
+        return None
+
+    def _link_run(self, start_cluster, n_clusters):
+        for i in range(start_cluster, start_cluster + n_clusters - 1):
+            self.fat[i] = i + 1
+        self.fat[start_cluster + n_clusters - 1] = fs_constants.END_OF_CHAIN
+
+    def check_extent(self, first_cluster, last_cluster):
+        # Validate a cached contiguity hint against the in-memory FAT before a raw range read
+        if not (0 < first_cluster <= last_cluster < fs_constants.CLUSTERS_NUMBER):
+            return False
+        if self.fat[last_cluster] != fs_constants.END_OF_CHAIN:
+            return False
+        return all(self.fat[i] == i + 1 for i in range(first_cluster, last_cluster))
+
+    def iter_chain(self, start_cluster):
+        # Lazy version of follow_chain: yields clusters as the FAT is walked
+        curr = start_cluster
+        count = 0
+
+        while curr != fs_constants.END_OF_CHAIN:
+            yield curr
+            curr = self.get_value(curr)
+
+            count += 1
+            if count > fs_constants.CLUSTERS_NUMBER:
+                raise Exception("Corrupted FAT: Infinite loop detected")
+
     def follow_chain(self, start_cluster):
         chain = []
         curr = start_cluster
@@ -81,11 +170,27 @@ class FatTableManager:
 
         return chain
 
+    def add_ref(self, start_cluster):
+        self.ref_counts[start_cluster] = self.ref_counts.get(start_cluster, 1) + 1
+
+    def is_shared(self, start_cluster):
+        return self.ref_counts.get(start_cluster, 1) > 1
+
     def free_chain(self, start_cluster):
+        # Shared chain: drop one reference and keep the clusters
+        count = self.ref_counts.get(start_cluster, 1)
+        if count > 1:
+            if count == 2:
+                del self.ref_counts[start_cluster]
+            else:
+                self.ref_counts[start_cluster] = count - 1
+            return False
+
         curr = start_cluster
         while curr != fs_constants.END_OF_CHAIN:
             next_cluster = self.get_value(curr)
             self.fat[curr] = fs_constants.FREE_CLUSTER
             curr = next_cluster
 
-        self.write_fat()
\ No newline at end of file
+        self.write_fat()
+        return True
\ No newline at end of file
@@ -1,19 +1,30 @@
+import fnmatch
 import math
 import os
+import tarfile
+import time
 import fs_constants
 from virtual_disk import VirtualDisk
 from fat_table_manager import FatTableManager
 from directory import Directory
 from directory_entry import DirectoryEntry
+from dedup_manager import DedupManager
+from chain_reader import ChainReader
 
 
 class FileSystem:
-    def __init__(self, disk_path):
+    def __init__(self, disk_path, dedup=False):
+        # Seconds spent in each mount stage (reported by main.py --profile)
+        self.mount_timings = {}
+        stage_start = time.perf_counter()
+
         self.disk = VirtualDisk()
         self.disk.initialize(disk_path)
+        stage_start = self._mark_stage("open_image", stage_start)
 
         self.fat = FatTableManager(self.disk)
         self.fat.load_fat()
+        stage_start = self._mark_stage("load_fat", stage_start)
 
         self.dir = Directory(self.disk, self.fat)
         self.current_dir = fs_constants.ROOT_DIR_CLUSTER
@@ -21,6 +32,36 @@ class FileSystem:
         # Check if fresh disk (Root directory cluster is free)
         if self.fat.get_value(self.current_dir) == fs_constants.FREE_CLUSTER:
             self._format_disk()
+            stage_start = self._mark_stage("format_disk", stage_start)
+
+        # Shared chains may exist on any image written with dedup: always recount owners
+        chains = self._count_owners()
+        stage_start = self._mark_stage("count_owners", stage_start)
+
+        # Optional content-addressed dedup of file data (rehashed from the tree on mount)
+        self.dedup = None
+        if dedup:
+            self.dedup = DedupManager(self.disk, self.fat)
+            self.dedup.rebuild(chains)
+            self._mark_stage("dedup_rebuild", stage_start)
+
+    def _mark_stage(self, name, stage_start):
+        now = time.perf_counter()
+        self.mount_timings[name] = now - stage_start
+        return now
+
+    def _count_owners(self):
+        # One tree walk (no data reads): refcounts for chains owned by several entries
+        owners = {}
+        sizes = {}
+        for _, entry, _ in self.walk_tree(fs_constants.ROOT_DIR_CLUSTER):
+            if entry.attr == fs_constants.ATTR_DIR or entry.first_cluster == 0:
+                continue
+            owners[entry.first_cluster] = owners.get(entry.first_cluster, 0) + 1
+            sizes[entry.first_cluster] = entry.file_size
+
+        self.fat.ref_counts = {cluster: count for cluster, count in owners.items() if count > 1}
+        return sizes
 
     def _format_disk(self):
         print("Formatting new disk...")
@@ -32,15 +73,59 @@ class FileSystem:
         self.fat.set_value(fs_constants.ROOT_DIR_CLUSTER, fs_constants.END_OF_CHAIN)
         self.fat.write_fat()
 
+    def _free_data(self, start_cluster):
+        # File data chains may be shared (free_chain respects refcounts either way)
+        if self.dedup:
+            self.dedup.release(start_cluster)
+        else:
+            self.fat.free_chain(start_cluster)
+
     def create_file(self, filename, parent_cluster=None):
         parent = parent_cluster if parent_cluster is not None else self.current_dir
 
         if self.dir.find_entry(parent, filename):
             print(f"Error: '{filename}' already exists.")
-            return
+            return False
 
-        new_entry = DirectoryEntry(filename, fs_constants.ATTR_FILE, 0, 0)
+        new_entry = DirectoryEntry(filename, fs_constants.ATTR_FILE, 0, 0, mtime=int(time.time()))
         self.dir.add_entry(parent, new_entry)
+        return True
+
+    def _chain_hints(self, start_cluster):
+        # Tail cluster and contiguity flag cached in the directory entry
+        chain = self.fat.follow_chain(start_cluster)
+        flags = 0
+        if chain == list(range(start_cluster, start_cluster + len(chain))):
+            flags = fs_constants.FLAG_CONTIGUOUS
+        return chain, chain[-1], flags
+
+    def _write_data(self, chain, flags, content):
+        if flags & fs_constants.FLAG_CONTIGUOUS:
+            # One range write for the whole extent
+            self.disk.write_clusters(chain[0], content)
+            return
+
+        # Write chunks
+        for i, cluster_idx in enumerate(chain):
+            start = i * fs_constants.CLUSTER_SIZE
+            chunk = content[start:start + fs_constants.CLUSTER_SIZE]
+
+            # Zero padding if needed
+            if len(chunk) < fs_constants.CLUSTER_SIZE:
+                chunk = chunk.ljust(fs_constants.CLUSTER_SIZE, b'\x00')
+
+            self.disk.write_cluster(cluster_idx, chunk)
+
+    def _read_data(self, entry):
+        if entry.is_contiguous and self.fat.check_extent(entry.first_cluster, entry.last_cluster):
+            # One range read for the whole extent
+            count = entry.last_cluster - entry.first_cluster + 1
+            return bytearray(self.disk.read_clusters(entry.first_cluster, count))[:entry.file_size]
+
+        content = bytearray()
+        for cluster_idx in self.fat.iter_chain(entry.first_cluster):
+            content.extend(self.disk.read_cluster(cluster_idx))
+        return content[:entry.file_size]
 
     def write_file(self, filename, content, parent_cluster=None):
         parent = parent_cluster if parent_cluster is not None else self.current_dir
@@ -48,42 +133,43 @@ class FileSystem:
 
         if not entry:
             print(f"Error: '{filename}' not found.")
-            return
+            return False
 
         size = len(content)
         clusters_needed = math.ceil(size / fs_constants.CLUSTER_SIZE)
 
         if clusters_needed == 0:
             print("Warning: Writing empty content.")
-            return
+            return False
 
-        # Overwrite: Free old data first
+        # Overwrite: Free old data first (copy-on-write for shared chains)
         if entry.first_cluster != 0:
-            self.fat.free_chain(entry.first_cluster)
+            self._free_data(entry.first_cluster)
 
         try:
-            start_cluster = self.fat.allocate_chain(clusters_needed)
-            chain = self.fat.follow_chain(start_cluster)
-
-            # Write chunks
-            for i, cluster_idx in enumerate(chain):
-                start = i * fs_constants.CLUSTER_SIZE
-                end = min(start + fs_constants.CLUSTER_SIZE, size)
-                chunk = content[start:end]
-
-                # Zero padding if needed
-                if len(chunk) < fs_constants.CLUSTER_SIZE:
-                    chunk = chunk.ljust(fs_constants.CLUSTER_SIZE, b'\x00')
-
-                self.disk.write_cluster(cluster_idx, chunk)
-
-            # Update entry (Remove old -> Add new)
-            self.dir.remove_entry(parent, filename)
-            updated_entry = DirectoryEntry(filename, fs_constants.ATTR_FILE, start_cluster, size)
-            self.dir.add_entry(parent, updated_entry)
+            start_cluster = self.dedup.lookup(content) if self.dedup else None
+
+            if start_cluster is not None:
+                # Identical data already on disk -> just take a reference
+                self.dedup.share(start_cluster)
+                _, last_cluster, flags = self._chain_hints(start_cluster)
+            else:
+                start_cluster = self.fat.allocate_chain(clusters_needed)
+                chain, last_cluster, flags = self._chain_hints(start_cluster)
+                self._write_data(chain, flags, content)
+
+                if self.dedup:
+                    self.dedup.register(start_cluster, bytes(content))
+
+            # Update entry in place
+            updated_entry = DirectoryEntry(filename, fs_constants.ATTR_FILE, start_cluster, size,
+                                           int(time.time()), last_cluster, flags)
+            self.dir.update_entry(parent, updated_entry)
+            return True
 
         except Exception as e:
             print(f"Write failed: {e}")
+            return False
 
     def read_file(self, filename, parent_cluster=None, silent=False):
         parent = parent_cluster if parent_cluster is not None else self.current_dir
@@ -97,19 +183,60 @@ class FileSystem:
         if entry.first_cluster == 0:
             return b""
 
-        chain = self.fat.follow_chain(entry.first_cluster)
-        content = bytearray()
-
-        for cluster_idx in chain:
-            content.extend(self.disk.read_cluster(cluster_idx))
-
-        return content[:entry.file_size]
+        return self._read_data(entry)
 
     def append_to_file(self, filename, new_data, parent_cluster=None):
-        # Read old -> Concatenate -> Write new
         parent = parent_cluster if parent_cluster is not None else self.current_dir
-        old_content = self.read_file(filename, parent, silent=True) or b""
-        self.write_file(filename, old_content + new_data, parent)
+        entry = self.dir.find_entry(parent, filename)
+
+        # Empty, shared (dedup) or unusual entries: Read old -> Concatenate -> Write new
+        if (not entry or entry.attr != fs_constants.ATTR_FILE or entry.first_cluster == 0
+                or not new_data or self.fat.is_shared(entry.first_cluster)):
+            old_content = self.read_file(filename, parent, silent=True) or b""
+            return self.write_file(filename, old_content + new_data, parent)
+
+        # Jump straight to the tail: cached hint, or walk the chain on older entries
+        last_cluster = entry.last_cluster
+        if not last_cluster or self.fat.get_value(last_cluster) != fs_constants.END_OF_CHAIN:
+            _, last_cluster, entry.flags = self._chain_hints(entry.first_cluster)
+
+        try:
+            # 1. Fill the free space of the last cluster
+            used = entry.file_size % fs_constants.CLUSTER_SIZE
+            fill = 0
+            if used:
+                fill = min(fs_constants.CLUSTER_SIZE - used, len(new_data))
+                data = bytearray(self.disk.read_cluster(last_cluster))
+                data[used: used + fill] = new_data[:fill]
+                self.disk.write_cluster(last_cluster, data)
+
+            # 2. Link new clusters for the rest
+            rest = new_data[fill:]
+            if rest:
+                new_start = self.fat.allocate_chain(math.ceil(len(rest) / fs_constants.CLUSTER_SIZE))
+                chain, new_last, new_flags = self._chain_hints(new_start)
+                self._write_data(chain, new_flags, rest)
+
+                self.fat.set_value(last_cluster, new_start)
+                self.fat.write_fat()
+
+                if new_start != last_cluster + 1 or not new_flags:
+                    entry.flags &= ~fs_constants.FLAG_CONTIGUOUS
+                last_cluster = new_last
+
+            # Content changed in place, its old digest no longer applies
+            if self.dedup:
+                self.dedup.forget(entry.first_cluster)
+
+            entry.file_size += len(new_data)
+            entry.mtime = int(time.time())
+            entry.last_cluster = last_cluster
+            self.dir.update_entry(parent, entry)
+            return True
+
+        except Exception as e:
+            print(f"Append failed: {e}")
+            return False
 
     def delete_file(self, filename, parent_cluster=None):
         parent = parent_cluster if parent_cluster is not None else self.current_dir
@@ -117,12 +244,13 @@ class FileSystem:
 
         if not entry:
             print(f"Error: '{filename}' not found.")
-            return
+            return False
 
         if entry.first_cluster != 0:
-            self.fat.free_chain(entry.first_cluster)
+            self._free_data(entry.first_cluster)
 
         self.dir.remove_entry(parent, filename)
+        return True
 
     def create_directory(self, dirname, parent_cluster=None):
         parent = parent_cluster if parent_cluster is not None else self.current_dir
@@ -136,8 +264,9 @@ class FileSystem:
             # Clear new cluster
             self.disk.write_cluster(cluster, bytes(fs_constants.CLUSTER_SIZE))
 
-            entry = DirectoryEntry(dirname, fs_constants.ATTR_DIR, cluster, 0)
+            entry = DirectoryEntry(dirname, fs_constants.ATTR_DIR, cluster, 0, mtime=int(time.time()))
             self.dir.add_entry(parent, entry)
+            return cluster
         except Exception as e:
             print(f"Mkdir failed: {e}")
 
@@ -149,31 +278,63 @@ class FileSystem:
             print(f"Error: Invalid directory '{dirname}'.")
             return
 
-        # Ensure empty
-        contents = self.dir.read_directory(entry.first_cluster)
-        if contents:
+        # Ensure empty (stops at the first used slot)
+        if next(self.dir.iter_entries(entry.first_cluster), None) is not None:
             print(f"Error: Directory '{dirname}' is not empty.")
             return
 
         self.dir.remove_entry(parent, dirname)
         self.fat.free_chain(entry.first_cluster)
 
-    def list_directory(self, parent_cluster=None):
+    def list_directory(self, parent_cluster=None, pattern=None, by_time=False):
         parent = parent_cluster if parent_cluster is not None else self.current_dir
-        entries = self.dir.read_directory(parent)
+        # Optional glob filter on the clean name (e.g. "*.TXT"), case-insensitive
+        pattern = pattern.upper() if pattern else None
+
+        entries = (e for e, _, _ in self.dir.iter_entries(parent))
+        if by_time:
+            # ls -t: newest first (needs the whole listing before printing)
+            entries = sorted(entries, key=lambda e: e.mtime, reverse=True)
 
         print(f"\nDirectory listing for cluster {parent}:")
-        print(f"{'Name':<15} {'Type':<10} {'Size':<10} {'Cluster'}")
-        print("-" * 50)
+        print(f"{'Name':<15} {'Type':<10} {'Size':<10} {'Cluster':<10} {'Modified'}")
+        print("-" * 66)
+        # Stream rows while the directory chain is read
         for e in entries:
+            if pattern and not fnmatch.fnmatchcase(e.clean_name, pattern):
+                continue
             type_str = "<DIR>" if e.attr == fs_constants.ATTR_DIR else "<FILE>"
-            print(f"{e.clean_name:<15} {type_str:<10} {e.file_size:<10} {e.first_cluster}")
-        print("-" * 50)
+            # Entries from older images carry no timestamp
+            mtime_str = time.strftime("%Y-%m-%d %H:%M", time.localtime(e.mtime)) if e.mtime else "-"
+            print(f"{e.clean_name:<15} {type_str:<10} {e.file_size:<10} {e.first_cluster:<10} {mtime_str}")
+        print("-" * 66)
 
     def copy_file(self, src, dst, parent_cluster=None, silent=False):
         if src.upper() == dst.upper():
             print(f"Error: Source and destination cannot be the same.")
             return
+
+        if self.dedup:
+            # Share the source chain instead of duplicating its clusters
+            parent = parent_cluster if parent_cluster is not None else self.current_dir
+            entry = self.dir.find_entry(parent, src)
+            if entry is None or entry.attr == fs_constants.ATTR_DIR:
+                print(f"Error: '{src}' not found.")
+                return
+            existing = self.dir.find_entry(parent, dst)
+            if existing:
+                if existing.attr == fs_constants.ATTR_DIR:
+                    print(f"Error: '{dst}' is a directory.")
+                    return
+                self.delete_file(dst, parent)
+            if entry.first_cluster != 0:
+                self.dedup.share(entry.first_cluster)
+            self.dir.add_entry(parent, DirectoryEntry(dst, fs_constants.ATTR_FILE, entry.first_cluster, entry.file_size,
+                                                      int(time.time()), entry.last_cluster, entry.flags))
+            if not silent:
+                print(f"Copied '{src}' to '{dst}'.")
+            return
+
         content = self.read_file(src, parent_cluster)
         if content is not None:
             self.create_file(dst, parent_cluster)
@@ -217,6 +378,336 @@ class FileSystem:
         except Exception as e:
             print(f"Export failed: {e}")
 
+    def walk_tree(self, start_cluster=None, prefix=""):
+        """Depth-first walk yielding (path, entry, parent_cluster); directories come before their contents."""
+        start = start_cluster if start_cluster is not None else self.current_dir
+
+        for entry, _, _ in self.dir.iter_entries(start):
+            path = f"{prefix}{entry.clean_name}"
+            yield path, entry, start
+            if entry.attr == fs_constants.ATTR_DIR:
+                yield from self.walk_tree(entry.first_cluster, path + "/")
+
+    def remove_tree(self, dirname, parent_cluster=None):
+        """rm -r: free a directory and everything below it with a single FAT flush."""
+        parent = parent_cluster if parent_cluster is not None else self.current_dir
+        entry = self.dir.find_entry(parent, dirname)
+
+        if not entry or entry.attr != fs_constants.ATTR_DIR:
+            print(f"Error: Invalid directory '{dirname}'.")
+            return 0
+
+        # Collect first, the walk reads clusters that are about to be freed
+        nodes = [e for _, e, _ in self.walk_tree(entry.first_cluster)]
+
+        with self.fat.deferred_writes():
+            for e in nodes:
+                if e.first_cluster == 0:
+                    continue
+                if e.attr == fs_constants.ATTR_DIR:
+                    self.fat.free_chain(e.first_cluster)
+                else:
+                    self._free_data(e.first_cluster)
+
+            self.dir.remove_entry(parent, dirname)
+            self.fat.free_chain(entry.first_cluster)
+
+        return len(nodes) + 1
+
+    def copy_tree(self, src, dst, parent_cluster=None):
+        """cp -r: copy a directory tree with destination chains allocated in one batch."""
+        parent = parent_cluster if parent_cluster is not None else self.current_dir
+        entry = self.dir.find_entry(parent, src)
+
+        if not entry or entry.attr != fs_constants.ATTR_DIR:
+            print(f"Error: Invalid directory '{src}'.")
+            return 0
+        if self.dir.find_entry(parent, dst):
+            print(f"Error: '{dst}' already exists.")
+            return 0
+
+        nodes = list(self.walk_tree(entry.first_cluster))
+        # With dedup on, file data is shared instead of copied
+        files = [e for _, e, _ in nodes if e.attr != fs_constants.ATTR_DIR and e.first_cluster != 0]
+        sizes = [] if self.dedup else [math.ceil(e.file_size / fs_constants.CLUSTER_SIZE) for e in files]
+
+        # Plan: data clusters plus every destination directory with its slot clusters
+        layout = {}
+        self._add_to_layout(layout, [dst], True)
+        for path, e, _ in nodes:
+            self._add_to_layout(layout, [dst] + path.split("/"), e.attr == fs_constants.ATTR_DIR)
+
+        needed = sum(sizes) + self._directory_clusters_needed(parent, layout)
+        if needed > self.fat.get_free_clusters_count():
+            print("Copy failed: Disk Full: Not enough free clusters")
+            return 0
+
+        count = 0
+        now = int(time.time())
+        try:
+            with self.fat.deferred_writes():
+                dst_cluster = self.create_directory(dst, parent)
+                if dst_cluster is None:
+                    raise Exception(f"Cannot create '{dst}'")
+                dir_clusters = {"": dst_cluster}
+                count += 1
+
+                starts = iter(self.fat.allocate_extents(sizes)) if sizes else None
+
+                for path, e, _ in nodes:
+                    head, _, name = path.rpartition("/")
+                    target = dir_clusters[head]
+
+                    if e.attr == fs_constants.ATTR_DIR:
+                        cluster = self.create_directory(name, target)
+                        if cluster is None:
+                            raise Exception(f"Cannot create '{path}'")
+                        dir_clusters[path] = cluster
+                        count += 1
+                        continue
+
+                    start_cluster, last_cluster, flags = 0, 0, 0
+                    if e.first_cluster != 0:
+                        if self.dedup:
+                            self.dedup.share(e.first_cluster)
+                            start_cluster, last_cluster, flags = e.first_cluster, e.last_cluster, e.flags
+                        else:
+                            start_cluster = next(starts)
+                            chain, last_cluster, flags = self._chain_hints(start_cluster)
+                            self._write_data(chain, flags, self._read_data(e))
+
+                    self.dir.add_entry(target, DirectoryEntry(name, fs_constants.ATTR_FILE, start_cluster,
+                                                              e.file_size, now, last_cluster, flags))
+                    count += 1
+        except Exception as e:
+            print(f"Copy failed: {e}")
+
+        return count
+
+    def disk_usage(self, dir_cluster=None):
+        """du: totals for a subtree gathered in one walk (shared chains counted once)."""
+        usage = {"files": 0, "dirs": 0, "bytes": 0, "clusters": 0}
+        seen = set()
+
+        for _, e, _ in self.walk_tree(dir_cluster):
+            if e.attr == fs_constants.ATTR_DIR:
+                usage["dirs"] += 1
+                usage["clusters"] += len(self.fat.follow_chain(e.first_cluster))
+                continue
+
+            usage["files"] += 1
+            usage["bytes"] += e.file_size
+            if e.first_cluster != 0 and e.first_cluster not in seen:
+                seen.add(e.first_cluster)
+                usage["clusters"] += math.ceil(e.file_size / fs_constants.CLUSTER_SIZE)
+
+        return usage
+
+    def export_tree(self, dir_cluster, out_stream):
+        """Stream every file and directory under dir_cluster into a tar archive."""
+        count = 0
+        # 'w|' writes sequentially, out_stream does not need to be seekable
+        with tarfile.open(fileobj=out_stream, mode='w|') as tar:
+            for path, entry, _ in self.walk_tree(dir_cluster):
+                info = tarfile.TarInfo(path)
+                info.mtime = entry.mtime
+
+                if entry.attr == fs_constants.ATTR_DIR:
+                    info.type = tarfile.DIRTYPE
+                    info.mode = 0o755
+                    tar.addfile(info)
+                else:
+                    info.size = entry.file_size
+                    info.mode = 0o644
+                    # Data goes straight from the chain into the archive
+                    tar.addfile(info, ChainReader(self.disk, self.fat, entry))
+                count += 1
+        return count
+
+    @staticmethod
+    def _archive_parts(name):
+        # Archive paths -> components (never escape the target directory)
+        return [p for p in name.replace("\\", "/").split("/") if p not in ("", ".", "..")]
+
+    def _ensure_path(self, dir_clusters, parts):
+        # Resolve (creating as needed) the directory for parts, cached by path
+        key = "/".join(parts)
+        if key in dir_clusters:
+            return dir_clusters[key]
+
+        parent = self._ensure_path(dir_clusters, parts[:-1])
+        if parent is None:
+            return None
+
+        entry = self.dir.find_entry(parent, parts[-1])
+        if entry is None:
+            self.create_directory(parts[-1], parent)
+            entry = self.dir.find_entry(parent, parts[-1])
+
+        if entry is None or entry.attr != fs_constants.ATTR_DIR:
+            print(f"Error: '{key}' is not a directory.")
+            dir_clusters[key] = None
+            return None
+
+        dir_clusters[key] = entry.first_cluster
+        return entry.first_cluster
+
+    @staticmethod
+    def _add_to_layout(layout, parts, is_dir):
+        # layout: directory path (tuple of 8.3 names, () = base) -> set of 8.3 names it receives
+        names = tuple(DirectoryEntry.format_name(p) for p in parts)
+        for i in range(len(names)):
+            layout.setdefault(names[:i], set()).add(names[i])
+        if is_dir:
+            layout.setdefault(names, set())
+
+    def _directory_clusters_needed(self, base_cluster, layout):
+        """Clusters needed for new directories and for slot growth of existing ones."""
+        needed = 0
+        clusters = {(): base_cluster}
+
+        for path in sorted(layout, key=len):
+            if path:
+                parent = clusters.get(path[:-1])
+                entry = self.dir.find_entry(parent, path[-1]) if parent is not None else None
+                clusters[path] = entry.first_cluster if entry and entry.attr == fs_constants.ATTR_DIR else None
+
+            names = layout[path]
+            cluster = clusters[path]
+            if cluster is None:
+                # New directory: create_directory allocates the first cluster
+                needed += math.ceil(max(len(names), 1) / fs_constants.ENTRIES_PER_CLUSTER)
+                continue
+
+            # Existing directory: add_entry only grows it once its free slots run out
+            present = [e.raw_name for e, _, _ in self.dir.iter_entries(cluster)]
+            new_names = names.difference(present)
+            free_slots = len(self.fat.follow_chain(cluster)) * fs_constants.ENTRIES_PER_CLUSTER - len(present)
+            needed += math.ceil(max(0, len(new_names) - free_slots) / fs_constants.ENTRIES_PER_CLUSTER)
+
+        return needed
+
+    def import_tree(self, in_stream, parent_cluster=None):
+        """Bulk-load a tar archive under parent_cluster with planned allocation and one FAT flush."""
+        parent = parent_cluster if parent_cluster is not None else self.current_dir
+
+        try:
+            tar = tarfile.open(fileobj=in_stream, mode='r:*')
+            members = tar.getmembers()
+        except tarfile.TarError as e:
+            print(f"Restore failed: {e}")
+            return 0
+
+        files = [m for m in members if m.isfile() and self._archive_parts(m.name)]
+        dirs = [m for m in members if m.isdir() and self._archive_parts(m.name)]
+        sizes = [math.ceil(m.size / fs_constants.CLUSTER_SIZE) for m in files]
+
+        if self.dedup:
+            # Content already indexed (or repeated in the archive) only takes a reference
+            seen = set()
+            try:
+                for i, m in enumerate(files):
+                    if not sizes[i]:
+                        continue
+                    digest = self.dedup.digest(tar.extractfile(m).read())
+                    if digest in self.dedup.index or digest in seen:
+                        sizes[i] = 0
+                    seen.add(digest)
+            except Exception as e:
+                print(f"Restore failed: {e}")
+                return 0
+
+        # Plan: data clusters, new (also implied) directories and directory slot growth
+        layout = {}
+        for m in dirs:
+            self._add_to_layout(layout, self._archive_parts(m.name), True)
+        for m in files:
+            self._add_to_layout(layout, self._archive_parts(m.name), False)
+
+        needed = sum(sizes) + self._directory_clusters_needed(parent, layout)
+        if needed > self.fat.get_free_clusters_count():
+            print("Restore failed: Disk Full: Not enough free clusters")
+            return 0
+
+        count = 0
+        dir_clusters = {"": parent}
+        try:
+            with self.fat.deferred_writes():
+                # Chains allocated but not yet referenced by an entry (released on failure)
+                unattached = set()
+                try:
+                    for m in dirs:
+                        if self._ensure_path(dir_clusters, self._archive_parts(m.name)) is not None:
+                            count += 1
+
+                    # All file data laid out back to back in one pass
+                    starts = self.fat.allocate_extents(sizes)
+                    unattached.update(start for start in starts if start != -1)
+
+                    for m, start_cluster in zip(files, starts):
+                        if self._import_member(tar, m, start_cluster, dir_clusters, unattached):
+                            count += 1
+                except Exception:
+                    for start_cluster in unattached:
+                        self._free_data(start_cluster)
+                    raise
+        except Exception as e:
+            print(f"Restore failed: {e}")
+
+        tar.close()
+        return count
+
+    def _import_member(self, tar, m, start_cluster, dir_clusters, unattached):
+        parts = self._archive_parts(m.name)
+        target = self._ensure_path(dir_clusters, parts[:-1])
+        existing = self.dir.find_entry(target, parts[-1]) if target is not None else None
+
+        if target is None or (existing and existing.attr == fs_constants.ATTR_DIR):
+            if start_cluster != -1:
+                unattached.discard(start_cluster)
+                self.fat.free_chain(start_cluster)
+            return False
+
+        last_cluster, flags, shared = 0, 0, None
+        if m.size == 0:
+            start_cluster = 0
+        else:
+            content = tar.extractfile(m).read()
+            shared = self.dedup.lookup(content) if self.dedup else None
+            if shared is not None:
+                # Identical data already on disk: drop the planned extent (if any)
+                if start_cluster != -1:
+                    unattached.discard(start_cluster)
+                    self.fat.free_chain(start_cluster)
+                start_cluster = shared
+                _, last_cluster, flags = self._chain_hints(start_cluster)
+            else:
+                if start_cluster == -1:
+                    # Planned as a duplicate but that data was replaced meanwhile: allocate now
+                    start_cluster = self.fat.allocate_chain(math.ceil(m.size / fs_constants.CLUSTER_SIZE))
+                    unattached.add(start_cluster)
+                chain, last_cluster, flags = self._chain_hints(start_cluster)
+                self._write_data(chain, flags, content)
+                if self.dedup:
+                    self.dedup.register(start_cluster, content)
+
+        # Entry timestamps are u32 on disk, tar allows negative or larger values
+        mtime = max(0, min(int(m.mtime), 0xFFFFFFFF))
+        entry = DirectoryEntry(parts[-1], fs_constants.ATTR_FILE, start_cluster, m.size,
+                               mtime, last_cluster, flags)
+        if existing:
+            self.dir.update_entry(target, entry)
+        else:
+            self.dir.add_entry(target, entry)
+
+        # Referenced from now on: take the shared reference, then drop the replaced data
+        unattached.discard(start_cluster)
+        if shared is not None:
+            self.dedup.share(shared)
+        if existing and existing.first_cluster != 0:
+            self._free_data(existing.first_cluster)
+        return True
+
     def get_free_space(self):
         return self.fat.get_free_clusters_count() * fs_constants.CLUSTER_SIZE
 
@@ -4,6 +4,7 @@
 CLUSTER_SIZE = 1024
 CLUSTERS_NUMBER = 1024
 DIR_ENTRY_SIZE = 32
+ENTRIES_PER_CLUSTER = CLUSTER_SIZE // DIR_ENTRY_SIZE
 
 # Memory Layout
 SUPERBLOCK_CLUSTER = 0
@@ -18,4 +19,7 @@ END_OF_CHAIN = -1
 # Directory Entry Attributes
 ATTR_FILE = 0x00
 ATTR_DIR = 0x10
-EMPTY_ENTRY = 0x00
\ No newline at end of file
+EMPTY_ENTRY = 0x00
+
+# Directory Entry Flags (stored in former padding, 0 on older images)
+FLAG_CONTIGUOUS = 0x01
\ No newline at end of file
@@ -1,18 +1,35 @@
+import argparse
 import os
 from file_system import FileSystem
+from profiler import SessionProfiler
 from shell import Shell
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MiniFAT virtual file system shell")
+    parser.add_argument("--dedup", action="store_true", help="share identical file data between entries")
+    parser.add_argument("--profile", action="store_true", help="report mount stages and per-command wall time")
+    parser.add_argument("--profile-dir", help="also write cProfile/tracemalloc dumps per command (implies --profile)")
+    options = parser.parse_args()
+
+    profiler = None
+    if options.profile or options.profile_dir:
+        profiler = SessionProfiler(options.profile_dir)
+
     # 1. Setup Disk Path (Current Directory)
     disk_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "virtual_disk.bin"))
 
     print(f"Booting MiniFAT... Disk Image: {os.path.basename(disk_path)}")
 
     # 2. Initialize File System (The Kernel)
-    fs = FileSystem(disk_path)
+    if profiler:
+        with profiler.measure("mount", mount=True):
+            fs = FileSystem(disk_path, dedup=options.dedup)
+        profiler.mount_timings = fs.mount_timings
+    else:
+        fs = FileSystem(disk_path, dedup=options.dedup)
 
     # 3. Start Shell (The Interface)
-    shell = Shell(fs)
+    shell = Shell(fs, profiler)
 
     try:
         shell.run()
@@ -21,6 +38,9 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"\nCritical System Error: {e}")
     finally:
+        if profiler:
+            profiler.report()
+
         # Clean up and delete the disk file for a fresh start next run
         fs.cleanup()
-        print("System Shutdown Safely. Disk cleaned up.")
\ No newline at end of file
+        print("System Shutdown Safely. Disk cleaned up.")
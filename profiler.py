@@ -0,0 +1,85 @@
+import contextlib
+import cProfile
+import os
+import re
+import time
+import tracemalloc
+
+
+class SessionProfiler:
+    """Wall-time recorder for a shell session (main.py --profile).
+
+    With a dump directory, every measured block also writes a cProfile stats
+    file (<n>_<label>.prof) and the top tracemalloc allocation sites
+    (<n>_<label>.mem.txt).
+    """
+
+    TOP_ALLOCATIONS = 25
+
+    def __init__(self, dump_dir=None):
+        self.dump_dir = dump_dir
+        self.mount_timings = {}
+        self.mount_time = None  # Wall time of the whole mount
+        self.records = []  # (label, seconds) per command
+        self.dump_count = 0
+
+        if dump_dir:
+            os.makedirs(dump_dir, exist_ok=True)
+
+    @contextlib.contextmanager
+    def measure(self, label, mount=False):
+        # mount=True records the mount wall time instead of a command row
+        profile = None
+        if self.dump_dir:
+            tracemalloc.start()
+            profile = cProfile.Profile()
+            profile.enable()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if mount:
+                self.mount_time = elapsed
+            else:
+                self.records.append((label, elapsed))
+
+            if profile:
+                profile.disable()
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                self._dump(label, profile, snapshot)
+
+    def _dump(self, label, profile, snapshot):
+        self.dump_count += 1
+        safe_label = re.sub(r"\W", "_", label)
+        base = os.path.join(self.dump_dir, f"{self.dump_count:04d}_{safe_label}")
+
+        profile.dump_stats(base + ".prof")
+        with open(base + ".mem.txt", "w") as f:
+            for stat in snapshot.statistics("lineno")[:self.TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
+
+    def report(self):
+        print("\n=== Profile ===")
+        if self.mount_timings or self.mount_time is not None:
+            total = self.mount_time if self.mount_time is not None else sum(self.mount_timings.values())
+            print(f"Mount: {total * 1000:.2f} ms")
+            for stage, seconds in self.mount_timings.items():
+                print(f"  {stage:<15} {seconds * 1000:>10.2f} ms")
+
+        # Aggregate per command name
+        stats = {}
+        for label, seconds in self.records:
+            count, total, worst = stats.get(label, (0, 0.0, 0.0))
+            stats[label] = (count + 1, total + seconds, max(worst, seconds))
+
+        if stats:
+            print(f"{'Command':<15} {'Calls':>6} {'Total ms':>10} {'Mean ms':>10} {'Max ms':>10}")
+            print("-" * 55)
+            for label, (count, total, worst) in sorted(stats.items(), key=lambda kv: -kv[1][1]):
+                print(f"{label:<15} {count:>6} {total * 1000:>10.2f} {total / count * 1000:>10.2f} {worst * 1000:>10.2f}")
+
+        if self.dump_dir:
+            print(f"cProfile/tracemalloc dumps written to '{self.dump_dir}'.")
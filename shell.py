@@ -6,8 +6,20 @@ class Shell:
     # Invalid characters for FAT file names
     INVALID_CHARS = ['/', '\\', ':', '*', '?', '"', '<', '>', '|']
 
-    def __init__(self, file_system):
+    # Alternative spellings -> canonical command name
+    ALIASES = {
+        "quit": "exit", "cls": "clear", "dir": "ls", "md": "mkdir", "rd": "rmdir",
+        "type": "cat", "del": "rm", "copy": "cp", "move": "mv",
+    }
+    COMMANDS = {
+        "help", "clear", "ls", "cd", "mkdir", "rmdir", "touch", "cat", "rm", "cp", "mv",
+        "import", "export", "du", "backup", "restore", "echo",
+    }
+
+    def __init__(self, file_system, profiler=None):
         self.fs = file_system
+        # Optional SessionProfiler: times every dispatched command
+        self.profiler = profiler
         # Stack to keep track of directory clusters
         self.dir_cluster_history = [fs_constants.ROOT_DIR_CLUSTER]
         # Path history for display (Linux Style)
@@ -39,41 +51,56 @@ class Shell:
                 parts = user_input.split()
 
             command = parts[0].lower()
+            command = self.ALIASES.get(command, command)
             args = parts[1:]
 
-            # 3. Dispatch Command
-            if command == "exit" or command == "quit":
+            # 3. Dispatch Command (timed when profiling, unknown commands are not recorded)
+            if command == "exit":
                 break
-            elif command == "help":
-                self._cmd_help()
-            elif command == "cls" or command == "clear":
-                print("\n" * 50)
-            elif command == "ls" or command == "dir":
-                self._cmd_ls(args)
-            elif command == "cd":
-                self._cmd_cd(args)
-            elif command == "mkdir" or command == "md":
-                self._cmd_mkdir(args)
-            elif command == "rmdir" or command == "rd":
-                self._cmd_rmdir(args)
-            elif command == "touch":
-                self._cmd_touch(args)
-            elif command == "cat" or command == "type":
-                self._cmd_cat(args)
-            elif command == "rm" or command == "del":
-                self._cmd_rm(args)
-            elif command == "cp" or command == "copy":
-                self._cmd_cp(args)
-            elif command == "mv" or command == "move":
-                self._cmd_mv(args)
-            elif command == "import":
-                self._cmd_import(args)
-            elif command == "export":
-                self._cmd_export(args)
-            elif command == "echo":
-                self._cmd_echo(args)
+
+            if self.profiler and command in self.COMMANDS:
+                with self.profiler.measure(command):
+                    self._dispatch(command, args)
             else:
-                print(f"Unknown command: '{command}'")
+                self._dispatch(command, args)
+
+    def _dispatch(self, command, args):
+        if command == "help":
+            self._cmd_help()
+        elif command == "clear":
+            print("\n" * 50)
+        elif command == "ls":
+            self._cmd_ls(args)
+        elif command == "cd":
+            self._cmd_cd(args)
+        elif command == "mkdir":
+            self._cmd_mkdir(args)
+        elif command == "rmdir":
+            self._cmd_rmdir(args)
+        elif command == "touch":
+            self._cmd_touch(args)
+        elif command == "cat":
+            self._cmd_cat(args)
+        elif command == "rm":
+            self._cmd_rm(args)
+        elif command == "cp":
+            self._cmd_cp(args)
+        elif command == "mv":
+            self._cmd_mv(args)
+        elif command == "import":
+            self._cmd_import(args)
+        elif command == "export":
+            self._cmd_export(args)
+        elif command == "du":
+            self._cmd_du(args)
+        elif command == "backup":
+            self._cmd_backup(args)
+        elif command == "restore":
+            self._cmd_restore(args)
+        elif command == "echo":
+            self._cmd_echo(args)
+        else:
+            print(f"Unknown command: '{command}'")
 
     def _parse_echo(self, input_str):
         try:
@@ -103,17 +130,20 @@ class Shell:
 
     def _cmd_help(self):
         print("\nAvailable Commands:")
-        print("  ls [dir]        : List files")
+        print("  ls [-t] [dir] [glob] : List files (-t newest first, e.g. ls *.TXT)")
         print("  cd <dir>        : Change directory (.. to go back)")
         print("  mkdir <name>    : Create directory")
         print("  rmdir <name>    : Remove empty directory")
         print("  touch <name>    : Create empty file")
         print("  cat <name>      : Display file content")
-        print("  rm <name>       : Delete file")
-        print("  cp <src> <dst>  : Copy file")
+        print("  rm [-r] <name>  : Delete file (-r: directory tree)")
+        print("  cp [-r] <s> <d> : Copy file (-r: directory tree)")
         print("  mv <src> <dst>  : Move/Rename file")
         print("  import <path>   : Import file from computer")
         print("  export <name>   : Export file to computer")
+        print("  du [dir]        : Disk usage of a directory tree")
+        print("  backup <path>   : Save current dir tree to a tar on computer")
+        print("  restore <path>  : Load a tar backup into current dir")
         print("  echo <text>     : Write text to file (-append supported)")
         print("  clear           : Clear screen")
         print("  exit            : Exit shell")
@@ -122,6 +152,15 @@ class Shell:
     def _cmd_ls(self, args):
         # Back to the Clean/Simple Table Style
         target_cluster = self.fs.current_dir
+        pattern = None
+
+        # -t sorts by modification time
+        by_time = "-t" in args
+        args = [a for a in args if a != "-t"]
+
+        # A wildcard argument filters the listing instead of naming a directory
+        if args and any(ch in args[-1] for ch in "*?["):
+            pattern = args.pop()
 
         if args:
             dir_name = args[0]
@@ -135,7 +174,7 @@ class Shell:
                 print(f"Error: Directory '{dir_name}' not found.")
                 return
 
-        self.fs.list_directory(target_cluster)
+        self.fs.list_directory(target_cluster, pattern, by_time)
 
     def _cmd_cd(self, args):
         if not args:
@@ -188,13 +227,40 @@ class Shell:
             print(content.decode('utf-8', errors='replace'))
 
     def _cmd_rm(self, args):
+        if args and args[0] == "-r":
+            if len(args) < 2: print("Usage: rm -r <dirname>"); return
+            count = self.fs.remove_tree(args[1])
+            if count: print(f"Removed {count} entries.")
+            return
         if not args: print("Usage: rm <filename>"); return
         self.fs.delete_file(args[0])
 
     def _cmd_cp(self, args):
+        if args and args[0] == "-r":
+            if len(args) < 3: print("Usage: cp -r <src_dir> <dst_dir>"); return
+            if not self._is_valid_name(args[2]): return
+            count = self.fs.copy_tree(args[1], args[2])
+            if count: print(f"Copied {count} entries.")
+            return
         if len(args) < 2: print("Usage: cp <src> <dst>"); return
         self.fs.copy_file(args[0], args[1])
 
+    def _cmd_du(self, args):
+        target_cluster = self.fs.current_dir
+
+        if args:
+            entry = self.fs.dir.find_entry(self.fs.current_dir, args[0])
+            if entry and entry.attr == fs_constants.ATTR_DIR:
+                target_cluster = entry.first_cluster
+            else:
+                print(f"Error: Directory '{args[0]}' not found.")
+                return
+
+        usage = self.fs.disk_usage(target_cluster)
+        on_disk = usage["clusters"] * fs_constants.CLUSTER_SIZE
+        print(f"{usage['files']} files, {usage['dirs']} dirs: {usage['bytes']} bytes "
+              f"({usage['clusters']} clusters, {on_disk} bytes on disk)")
+
     def _cmd_mv(self, args):
         if len(args) < 2: print("Usage: mv <src> <dst>"); return
         self.fs.move_file(args[0], args[1])
@@ -209,6 +275,38 @@ class Shell:
         if len(args) < 2: print("Usage: export <virtual_name> <host_path>"); return
         self.fs.export_file_to_host(args[0], args[1])
 
+    def _cmd_backup(self, args):
+        if len(args) < 1: print("Usage: backup <host_path> [dir]"); return
+        target_cluster = self.fs.current_dir
+
+        if len(args) > 1:
+            entry = self.fs.dir.find_entry(self.fs.current_dir, args[1])
+            if entry and entry.attr == fs_constants.ATTR_DIR:
+                target_cluster = entry.first_cluster
+            else:
+                print(f"Error: Directory '{args[1]}' not found.")
+                return
+
+        try:
+            with open(args[0], 'wb') as f:
+                count = self.fs.export_tree(target_cluster, f)
+            print(f"Backed up {count} entries to '{args[0]}'.")
+        except Exception as e:
+            print(f"Backup failed: {e}")
+
+    def _cmd_restore(self, args):
+        if len(args) < 1: print("Usage: restore <host_path>"); return
+        if not os.path.exists(args[0]):
+            print("Host file not found.")
+            return
+
+        try:
+            with open(args[0], 'rb') as f:
+                count = self.fs.import_tree(f)
+            print(f"Restored {count} entries from '{args[0]}'.")
+        except Exception as e:
+            print(f"Restore failed: {e}")
+
     def _cmd_echo(self, args):
         if len(args) < 2: print("Usage: echo \"text\" <filename> [-append]"); return
         text = args[0]
@@ -45,6 +45,25 @@ class VirtualDisk:
         self.file.seek(cluster_idx * fs_constants.CLUSTER_SIZE)
         return self.file.read(fs_constants.CLUSTER_SIZE)
 
+    def write_clusters(self, start_idx, data):
+        # Single range write over consecutive clusters (last one zero padded)
+        count = -(-len(data) // fs_constants.CLUSTER_SIZE)
+        if not (0 <= start_idx and start_idx + count <= fs_constants.CLUSTERS_NUMBER):
+            raise IndexError(f"Cluster range {start_idx}+{count} out of bounds")
+
+        data = bytes(data).ljust(count * fs_constants.CLUSTER_SIZE, b'\x00')
+        self.file.seek(start_idx * fs_constants.CLUSTER_SIZE)
+        self.file.write(data)
+        self.file.flush()
+
+    def read_clusters(self, start_idx, count):
+        # Single range read over consecutive clusters
+        if not (0 <= start_idx and start_idx + count <= fs_constants.CLUSTERS_NUMBER):
+            raise IndexError(f"Cluster range {start_idx}+{count} out of bounds")
+
+        self.file.seek(start_idx * fs_constants.CLUSTER_SIZE)
+        return self.file.read(count * fs_constants.CLUSTER_SIZE)
+
     def close(self):
         if self.file:
             self.file.close()
@@ -0,0 +1,177 @@
+import multiprocessing
+import zlib
+import fs_constants
+from file_system import FileSystem
+
+
+def _split(path):
+    # "/docs/a.txt" -> ["DOCS", "A.TXT"]
+    return [p.upper() for p in path.replace("\\", "/").split("/") if p not in ("", ".")]
+
+
+def _walk(fs, parts):
+    # Cluster of the directory named by parts on this volume, or None
+    cluster = fs_constants.ROOT_DIR_CLUSTER
+    for name in parts:
+        entry = fs.dir.find_entry(cluster, name)
+        if entry is None or entry.attr != fs_constants.ATTR_DIR:
+            return None
+        cluster = entry.first_cluster
+    return cluster
+
+
+def _run_op(fs, op, parts, *args):
+    """Execute one namespace operation against the shard that owns parts."""
+    if op == "list":
+        cluster = _walk(fs, parts)
+        if cluster is None:
+            return None
+        return [(e.clean_name, e.attr, e.file_size) for e, _, _ in fs.dir.iter_entries(cluster)]
+
+    parent = _walk(fs, parts[:-1]) if parts else None
+    if op == "read":
+        return fs.read_file(parts[-1], parent, silent=True) if parent is not None else None
+    if op not in ("write", "append", "delete", "mkdir"):
+        raise ValueError(f"Unknown volume operation '{op}'")
+    if parent is None:
+        return False
+    name = parts[-1]
+
+    # Mutating operations report whether they actually took effect
+    try:
+        if op == "write":
+            if fs.dir.find_entry(parent, name) is None and not fs.create_file(name, parent):
+                return False
+            # Creating an empty file is all an empty write does
+            return not args[0] or bool(fs.write_file(name, args[0], parent))
+        if op == "append":
+            return bool(fs.append_to_file(name, args[0], parent))
+        if op == "delete":
+            return bool(fs.delete_file(name, parent))
+        return fs.create_directory(name, parent) is not None
+    except Exception as e:
+        print(f"Volume operation '{op}' failed: {e}")
+        return False
+
+
+def _serve_shard(job):
+    # Worker process: mount one image, run its batch in order, unmount
+    disk_path, dedup, batch = job
+    fs = FileSystem(disk_path, dedup)
+    try:
+        return [(index, _run_op(fs, op, parts, *args)) for index, op, parts, args in batch]
+    finally:
+        fs.close()
+
+
+class VolumeManager:
+    """Several disk images (shards) under one namespace.
+
+    Every path is routed by its top-level component: an explicit mount entry
+    if there is one, otherwise a hash of the name. Each shard is a normal
+    single-volume FileSystem, so FatTableManager stays unaware of the others.
+    """
+
+    def __init__(self, disk_paths, mounts=None, dedup=False):
+        if not disk_paths:
+            raise ValueError("VolumeManager needs at least one disk image")
+
+        self.disk_paths = list(disk_paths)
+        self.dedup = dedup
+        # Top-level name -> shard index (overrides hashing)
+        self.mounts = {name.upper(): idx for name, idx in (mounts or {}).items()}
+        for name, idx in self.mounts.items():
+            if not (isinstance(idx, int) and 0 <= idx < len(self.disk_paths)):
+                raise ValueError(f"Mount '{name}' points to invalid shard {idx!r}")
+        self.volumes = [FileSystem(path, dedup) for path in self.disk_paths]
+
+    def shard_for(self, path):
+        parts = _split(path)
+        if not parts:
+            raise ValueError("The namespace root is not stored on a single shard")
+
+        top = parts[0]
+        if top in self.mounts:
+            return self.mounts[top]
+        return zlib.crc32(top.encode('utf-8')) % len(self.volumes)
+
+    def _local(self, op, path, *args):
+        return _run_op(self.volumes[self.shard_for(path)], op, _split(path), *args)
+
+    def read_file(self, path):
+        return self._local("read", path)
+
+    def write_file(self, path, content):
+        return self._local("write", path, content)
+
+    def append_to_file(self, path, content):
+        return self._local("append", path, content)
+
+    def delete_file(self, path):
+        return self._local("delete", path)
+
+    def create_directory(self, path):
+        return self._local("mkdir", path)
+
+    def list_directory(self, path="/"):
+        if not _split(path):
+            # Root is the union of all shard roots
+            merged = []
+            for fs in self.volumes:
+                merged.extend(_run_op(fs, "list", []))
+            return merged
+        return self._local("list", path)
+
+    def run_parallel(self, ops, processes=None):
+        """Run [(op, path, *args), ...] with one worker process per shard.
+
+        Operations on the same shard keep their relative order; results come
+        back in the order of ops. Listing "/" merges every shard root, other
+        operations on "/" fail on their own (None/False).
+        """
+        batches = {}
+        results = [None] * len(ops)
+        fan_out = set()
+        for index, (op, path, *args) in enumerate(ops):
+            parts = _split(path)
+            if parts:
+                shards = [self.shard_for(path)]
+            elif op == "list":
+                # Root listing: every shard contributes its root entries
+                shards = range(len(self.volumes))
+                fan_out.add(index)
+                results[index] = []
+            else:
+                # No single shard owns the root itself
+                results[index] = None if op == "read" else False
+                continue
+
+            for shard in shards:
+                batches.setdefault(shard, []).append((index, op, parts, args))
+
+        if not batches:
+            return results
+
+        # Workers own the images while they run, local FAT caches would go stale
+        self.close()
+        try:
+            jobs = [(self.disk_paths[shard], self.dedup, batch) for shard, batch in batches.items()]
+            with multiprocessing.Pool(processes or len(jobs)) as pool:
+                shard_results = pool.map(_serve_shard, jobs)
+        finally:
+            self.volumes = [FileSystem(path, self.dedup) for path in self.disk_paths]
+
+        for batch_results in shard_results:
+            for index, value in batch_results:
+                if index in fan_out:
+                    results[index].extend(value or [])
+                else:
+                    results[index] = value
+        return results
+
+    def get_free_space(self):
+        return sum(fs.get_free_space() for fs in self.volumes)
+
+    def close(self):
+        for fs in self.volumes:
+            fs.close()